@@ -7,7 +7,7 @@ A modular AI assistant with separated responsibilities.
 from .ai_client import AIClient
 from .archive_manager import ArchiveManager
 from .command_processor import CommandProcessor
-from .conversation_manager import ConversationManager
+from .conversation_manager import ConversationManager, Message
 from .command_executor import CommandExecutor
 from .approval_analyzer import ApprovalAnalyzer
 
@@ -16,6 +16,7 @@ __all__ = [
     'ArchiveManager', 
     'CommandProcessor',
     'ConversationManager',
+    'Message',
     'CommandExecutor',
     'ApprovalAnalyzer'
 ]
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+File I/O
+Low-level file writing helpers shared by the assistant modules.
+"""
+
+import os
+from pathlib import Path
+
+# O_BINARY only exists on Windows, where it disables newline translation
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+_APPEND_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+
+
+def open_append(path: Path) -> int:
+    """Open a file for unbuffered appends and return its descriptor."""
+    return os.open(path, _APPEND_FLAGS, 0o644)
+
+
+def write_all(fd: int, content: bytes):
+    """Write all bytes to a descriptor, in a single call for typical sizes."""
+    view = memoryview(content)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def replace_file(path: Path, content: bytes):
+    """Atomically replace a file so that a crash never leaves it half-written."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp_path, _WRITE_FLAGS, 0o644)
+    try:
+        write_all(fd, content)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+JSON Serialization
+Shared JSON helpers, using orjson when it is installed and the standard library otherwise.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+_encode_indented = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+
+
+def dumpb(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, compact unless indent is requested."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return (_encode_indented if indent else _encode)(obj).encode('utf-8')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
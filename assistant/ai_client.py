@@ -5,60 +5,101 @@ Handles communication with Ollama and AI model management.
 """
 
 import sys
-from typing import List, Dict, Any
-import ollama
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple, FrozenSet
 
 
 class AIClient:
     """Manages AI model interactions and communication with Ollama."""
     
-    def __init__(self, model: str = "llama3.2:3B"):
+    def __init__(self, model: str = "llama3.2:3B", keep_alive: str = "10m"):
         self.model = model
+        self.keep_alive = keep_alive  # How long Ollama keeps the model loaded between requests
         self.client = None
+        self._models_cache: Optional[Tuple[float, List[str], FrozenSet[str]]] = None
+        self._models_ttl = 30.0  # seconds
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize the Ollama client and test connection."""
         try:
+            # Imported here so that offline features don't pay for ollama/httpx/pydantic
+            import ollama
+            
             self.client = ollama.Client()
-            # Test connection
-            self.client.list()
+            # Test connection, keeping the model list for /model
+            self._cache_models(self.client.list())
         except Exception as e:
             print(f"Error connecting to Ollama: {e}")
             print("Make sure Ollama is running and accessible.")
             sys.exit(1)
     
-    def get_ai_response(self, messages: List[Dict[str, str]]) -> str:
-        """Get AI response from Ollama with given messages."""
+    def get_ai_response(self, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]] = None,
+                        on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Get AI response from Ollama, passing each streamed piece to on_token when given."""
         try:
             response = self.client.chat(
                 model=self.model,
                 messages=messages,
-                stream=False
+                stream=on_token is not None,
+                keep_alive=self.keep_alive,
+                options=options
             )
-            return response['message']['content']
+            if on_token is None:
+                return response['message']['content']
+            
+            parts = []
+            for chunk in response:
+                token = chunk['message']['content']
+                if token:
+                    on_token(token)
+                    parts.append(token)
+            return "".join(parts)
         except Exception as e:
-            return f"Error getting AI response: {e}"
+            error = f"Error getting AI response: {e}"
+            if on_token is not None:
+                on_token(error)
+            return error
+    
+    def _cache_models(self, models) -> List[str]:
+        """Store the model names of an Ollama list() response."""
+        # Recent ollama releases name the field 'model', older ones 'name'
+        available_models = [m.get('model') or m.get('name') for m in models['models']]
+        self._models_cache = (time.monotonic(), available_models, frozenset(available_models))
+        return available_models
+    
+    def _list_models(self, refresh: bool = False) -> List[str]:
+        """List available model names, cached for a short time."""
+        if (not refresh and self._models_cache
+                and time.monotonic() - self._models_cache[0] < self._models_ttl):
+            return self._models_cache[1]
+        return self._cache_models(self.client.list())
+    
+    def _has_model(self, name: str) -> bool:
+        """Check whether a model is available, refreshing the cache once on a miss."""
+        self._list_models()
+        if name in self._models_cache[2]:
+            return True
+        # The model may have been pulled since the list was cached
+        self._list_models(refresh=True)
+        return name in self._models_cache[2]
     
     def change_model(self, new_model: str) -> str:
         """Change the AI model and verify it exists."""
         try:
             # Test if model exists
-            models = self.client.list()
-            available_models = [m['name'] for m in models['models']]
-            if new_model in available_models:
+            if self._has_model(new_model):
                 self.model = new_model
                 return f"Model changed to {new_model}"
             else:
-                return f"Model {new_model} not found. Available models: {', '.join(available_models)}"
+                return f"Model {new_model} not found. Available models: {', '.join(self._list_models())}"
         except Exception as e:
             return f"Error changing model: {e}"
     
     def get_available_models(self) -> List[str]:
         """Get list of available models."""
         try:
-            models = self.client.list()
-            return [m['name'] for m in models['models']]
+            return list(self._list_models())
         except Exception as e:
             print(f"Error getting available models: {e}")
             return []
@@ -4,15 +4,61 @@ Approval Analyzer
 Uses AI to analyze user responses for command approval.
 """
 
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 import re
+from .conversation_manager import Message
+from ._fileio import replace_file
+from ._json import dumpb, loads
+
+
+# Clear positive and negative indicators, compiled once at import time
+_POSITIVE_RE = re.compile(
+    r"\b(?:yes|oui|y|ok|okay|sure|bien|d'accord|confirm|execute|go|run|do it"
+    r"|bien sûr|confirmer|exécuter|lancer)\b",
+    re.IGNORECASE
+)
+_NEGATIVE_RE = re.compile(
+    r"\b(?:no|non|n|cancel|stop|abort|annuler|refuser|ne pas|arrêter)\b",
+    re.IGNORECASE
+)
+
+# Common one-word answers, resolved with a set lookup before the regex engine
+_FAST_YES = frozenset({"y", "yes", "yeah", "yep", "yup", "ok", "okay", "oui", "sure", "si", "sí", "ya", "da"})
+_FAST_NO = frozenset({"n", "no", "non", "nope", "nah", "cancel", "stop", "abort"})
+_FAST_MAX_LEN = max(len(answer) for answer in _FAST_YES | _FAST_NO)
+
+# [EXECUTE:command] markers suggested by the AI
+_EXECUTE_RE = re.compile(r'\[EXECUTE:([^\]]+)\]', re.IGNORECASE)
+
+# Prompt for the AI fallback; the static preamble lets Ollama reuse its prompt cache
+_APPROVAL_TMPL = """
+Analyze this user response to determine if they are approving or rejecting a command execution request.
+
+User response: "%s"
+
+Does this response mean "YES" (approve) or "NO" (reject)?
+Respond with only "YES" or "NO".
+"""
+
+# Deterministic answer of a few tokens, enough for wrappers such as "**YES**" or "Answer: YES"
+_APPROVAL_OPTIONS = {"num_predict": 8, "temperature": 0}
+
+# First YES/NO word of the AI answer
+_ANSWER_RE = re.compile(r"\b(YES|NO)\b", re.IGNORECASE)
+
+# AI classifications of ambiguous responses, persisted across sessions
+_APPROVAL_CACHE_FILE = Path.home() / ".cache" / "assistant" / "approval_cache.json"
+_APPROVAL_CACHE_SIZE = 512
 
 
 class ApprovalAnalyzer:
     """Analyzes user responses to determine if they approve command execution."""
     
-    def __init__(self, ai_client):
+    def __init__(self, ai_client, cache_file: Path = _APPROVAL_CACHE_FILE):
         self.ai_client = ai_client
+        self.cache_file = cache_file
+        self._approval_cache: Dict[str, bool] = self._load_cache()
     
     def analyze_approval_response(self, response: str) -> bool:
         """
@@ -25,88 +71,95 @@ class ApprovalAnalyzer:
             return simple_result
         
         # If ambiguous, use AI analysis
-        return self._ai_analysis(response)
+        return self._classify(response)
     
     def _simple_analysis(self, response: str) -> Optional[bool]:
         """Simple keyword-based analysis. Returns None if ambiguous."""
-        response_lower = response.lower().strip()
-        
-        # Clear positive indicators
-        positive_patterns = [
-            r'\b(yes|oui|y|ok|okay|sure|bien|d\'accord|confirm|execute|go|run|do it)\b',
-            r'\b(oui|bien sûr|d\'accord|confirmer|exécuter|lancer)\b',
-            r'^[yY]$',  # Just 'y' or 'Y'
-            r'^ok$',    # Just 'ok'
-        ]
+        response = response.strip()
         
-        # Clear negative indicators
-        negative_patterns = [
-            r'\b(no|non|n|cancel|stop|abort|annuler|refuser|ne pas)\b',
-            r'\b(non|annuler|refuser|ne pas faire|arrêter)\b',
-            r'^[nN]$',  # Just 'n' or 'N'
-        ]
-        
-        # Check for positive patterns
-        for pattern in positive_patterns:
-            if re.search(pattern, response_lower):
+        if len(response) <= _FAST_MAX_LEN:
+            answer = response.lower()
+            if answer in _FAST_YES:
                 return True
-        
-        # Check for negative patterns
-        for pattern in negative_patterns:
-            if re.search(pattern, response_lower):
+            if answer in _FAST_NO:
                 return False
         
+        if _POSITIVE_RE.search(response):
+            return True
+        
+        if _NEGATIVE_RE.search(response):
+            return False
+        
         # If no clear patterns found, return None for AI analysis
         return None
     
-    def _ai_analysis(self, response: str) -> bool:
-        """Use AI to analyze ambiguous responses."""
+    def _classify(self, response: str) -> bool:
+        """Classify an ambiguous response, reusing previous AI classifications."""
+        normalized = response.strip().lower()
+        cached = self._approval_cache.pop(normalized, None)
+        if cached is not None:
+            # Move it to the end so frequent answers are evicted last
+            self._approval_cache[normalized] = cached
+            return cached
+        
+        result = self._ai_analysis(response)
+        if result is None:
+            # If AI response is unclear, default to False for safety
+            return False
+        
+        if len(self._approval_cache) >= _APPROVAL_CACHE_SIZE:
+            # Evict the least recently used classification
+            del self._approval_cache[next(iter(self._approval_cache))]
+        self._approval_cache[normalized] = result
+        return result
+    
+    def _ai_analysis(self, response: str) -> Optional[bool]:
+        """Use AI to analyze ambiguous responses. Returns None if unclear."""
         try:
             # Create a simple prompt for the AI
-            prompt = f"""
-Analyze this user response to determine if they are approving or rejecting a command execution request.
-
-User response: "{response}"
-
-Does this response mean "YES" (approve) or "NO" (reject)?
-Respond with only "YES" or "NO".
-"""
+            messages = [{"role": "user", "content": _APPROVAL_TMPL % response}]
             
             # Get AI response
-            messages = [{"role": "user", "content": prompt}]
-            ai_response = self.ai_client.get_ai_response(messages)
+            ai_response = self.ai_client.get_ai_response(messages, options=_APPROVAL_OPTIONS)
             
             # Parse AI response
-            ai_response_clean = ai_response.strip().upper()
-            if "YES" in ai_response_clean:
-                return True
-            elif "NO" in ai_response_clean:
-                return False
-            else:
-                # If AI response is unclear, default to False for safety
-                return False
+            answer = _ANSWER_RE.search(ai_response)
+            if answer is None:
+                return None
+            return answer.group(1).upper() == "YES"
                 
         except Exception as e:
             print(f"Error in AI approval analysis: {e}")
-            # Default to False for safety
-            return False
+            return None
+    
+    def _load_cache(self) -> Dict[str, bool]:
+        """Load the persisted approval classifications."""
+        try:
+            data = loads(self.cache_file.read_bytes())
+            return {key: value for key, value in data.items() if isinstance(value, bool)}
+        except (OSError, ValueError, AttributeError):
+            return {}
+    
+    def save_cache(self):
+        """Persist the approval classifications for the next sessions."""
+        if not self._approval_cache:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            replace_file(self.cache_file, dumpb(self._approval_cache))
+        except OSError as e:
+            print(f"Warning: Failed to save approval cache: {e}")
     
-    def extract_pending_commands(self, conversation_history: List[Dict[str, str]]) -> List[str]:
+    def extract_pending_commands(self, conversation_history: List[Message]) -> List[str]:
         """Extract commands that are waiting for approval from conversation history."""
-        pending_commands = []
-        
-        # Look for recent AI responses with [EXECUTE:...] patterns
-        for message in reversed(conversation_history[-5:]):  # Check last 5 messages
-            if message['role'] == 'assistant':
-                commands = self._extract_execute_commands(message['content'])
-                if commands:
-                    pending_commands.extend(commands)
-                    break  # Only get commands from the most recent AI response
-        
-        return pending_commands
+        # Only get commands from the most recent AI response that has some (last 5 messages)
+        recent_commands = (
+            self._extract_execute_commands(message.content)
+            for message in reversed(conversation_history[-5:])
+            if message.role == 'assistant'
+        )
+        return next((commands for commands in recent_commands if commands), [])
     
     def _extract_execute_commands(self, text: str) -> List[str]:
         """Extract [EXECUTE:command] patterns from text."""
-        pattern = r'\[EXECUTE:([^\]]+)\]'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        return [match.strip() for match in matches]
+        return [match.group(1).strip() for match in _EXECUTE_RE.finditer(text)]
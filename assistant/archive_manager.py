@@ -4,12 +4,42 @@ Archive Manager
 Handles conversation archiving, session management, and conversation persistence.
 """
 
+import itertools
 import json
+import os
+import queue
+import sys
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from .conversation_manager import Message
+from ._fileio import open_append, replace_file, write_all
+from ._json import dumpb, loads
+
+
+# Finished sessions untouched for this long are stored gzip-compressed
+_COMPRESS_AFTER_DAYS = 7
+_COMPRESSED_SUFFIX = ".gz"
+
+# Messages per page for /archive-view <id> <page>
+_VIEW_PAGE_SIZE = 50
+
+# fromisoformat only accepts a trailing 'Z' from Python 3.11 on
+if sys.version_info >= (3, 11):
+    _parse_iso = datetime.fromisoformat
+else:
+    def _parse_iso(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _format_start_time(start_time: str) -> str:
+    """Format an ISO start time for listings, leaving unparsable values as they are."""
+    try:
+        return _parse_iso(start_time).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return start_time
 
 
 class ArchiveManager:
@@ -21,107 +51,314 @@ class ArchiveManager:
         
         # Real-time archiving settings
         self.auto_archive = True
-        self.archive_interval = 5  # seconds
         self.current_session_file: Optional[Path] = None
         self.archive_thread: Optional[threading.Thread] = None
-        self.stop_archive = False
+        self._write_queue: "queue.Queue[Optional[Tuple[Message, str]]]" = queue.Queue()
+        self._scan_cache: Optional[Tuple[int, List[Path]]] = None
+        self._session_mtimes: Dict[Path, int] = {}
+        # Listing summaries, reused while the session file is unchanged
+        self._summary_cache: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+        self._session_meta: Optional[Dict[str, str]] = None
+        # Descriptor kept open for appending to the current session file
+        self._append_fd: Optional[int] = None
+        self._append_path: Optional[Path] = None
+        
+        self.compress_old_sessions()
     
     def _get_session_filename(self) -> str:
-        """Generate a unique session filename."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"session_{timestamp}.json"
-    
-    def _archive_message(self, message: Dict[str, str], model: str):
-        """Archive a single message to the current session file."""
-        if not self.current_session_file:
-            self.current_session_file = self.archive_dir / self._get_session_filename()
+        """Generate a unique session filename from the current time."""
+        base_name = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        name = base_name
+        for counter in itertools.count(1):
+            # Never reuse the name of a session on disk, whatever its format
+            if not any((self.archive_dir / (name + suffix)).exists()
+                       for suffix in (".jsonl", ".jsonl" + _COMPRESSED_SUFFIX, ".json", ".meta.json")):
+                return f"{name}.jsonl"
+            name = f"{base_name}_{counter}"
+    
+    @staticmethod
+    def _get_uncompressed_file(session_file: Path) -> Path:
+        """Get the plain JSONL path of a session, stripping the compression suffix."""
+        if session_file.suffix == _COMPRESSED_SUFFIX:
+            return session_file.with_suffix("")
+        return session_file
+    
+    @staticmethod
+    def _get_meta_file(session_file: Path) -> Path:
+        """Get the sidecar metadata file of a session."""
+        return ArchiveManager._get_uncompressed_file(session_file).with_suffix(".meta.json")
+    
+    @staticmethod
+    def _is_session_filename(name: str) -> bool:
+        """Check if a file name is a session file, including legacy .json archives."""
+        return (name.startswith("session_")
+                and name.endswith((".jsonl", ".jsonl" + _COMPRESSED_SUFFIX, ".json"))
+                and not name.endswith(".meta.json"))
+    
+    @staticmethod
+    def _open_session(session_file: Path):
+        """Open a JSONL session for binary reading, decompressing it if needed."""
+        if session_file.suffix == _COMPRESSED_SUFFIX:
+            import gzip
+            return gzip.open(session_file, 'rb')
+        return open(session_file, 'rb')
+    
+    def _scan_sessions(self) -> List[Path]:
+        """List session files, newest first, rescanning only when the directory changes."""
+        try:
+            dir_mtime = self.archive_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        # Read once: the archive worker may reset the cache at any time
+        cache = self._scan_cache
+        if cache and cache[0] == dir_mtime:
+            return cache[1]
+        
+        with os.scandir(self.archive_dir) as entries:
+            sessions = sorted(
+                ((entry.stat().st_mtime_ns, Path(entry.path)) for entry in entries
+                 if self._is_session_filename(entry.name)),
+                key=lambda session: session[0], reverse=True
+            )
+        session_files = [path for _, path in sessions]
+        self._session_mtimes = {path: mtime for mtime, path in sessions}
+        self._scan_cache = (dir_mtime, session_files)
+        return session_files
+    
+    def _get_session_summary(self, session_file: Path) -> Dict[str, Any]:
+        """Get the listing fields of a session, reading the files only when they changed."""
+        mtime = self._session_mtimes.get(session_file)
+        cached = self._summary_cache.get(session_file)
+        if cached and cached[0] == mtime:
+            return cached[1]
         
+        data = self._read_session_header(session_file)
+        message_count = data.get('message_count')
+        if message_count is None:
+            message_count = self._count_session_messages(session_file)
+        summary = {
+            "session_id": data.get('session_id', session_file.stem),
+            "model": data.get('model', 'Unknown'),
+            "message_count": message_count,
+            "start_time": _format_start_time(data.get('start_time', 'Unknown'))
+        }
+        self._summary_cache[session_file] = (mtime, summary)
+        return summary
+    
+    def _start_session(self, model: str, timestamp: Optional[float] = None):
+        """Create a new session file and its metadata, with a start time at the given epoch time."""
+        start = datetime.now() if timestamp is None else datetime.fromtimestamp(timestamp)
+        start_iso = start.isoformat(timespec='seconds')
+        self.current_session_file = self.archive_dir / self._get_session_filename()
+        self._session_meta = {
+            "session_id": self.current_session_file.stem,
+            "model": model,
+            "start_time": start_iso,
+            "last_updated": start_iso
+        }
+        self._write_session_meta()
+    
+    def _write_session_meta(self):
+        """Write the current session metadata to its sidecar file."""
+        if not self.current_session_file or not self._session_meta:
+            return
+        replace_file(self._get_meta_file(self.current_session_file), dumpb(self._session_meta))
+    
+    def _flush_session_meta(self):
+        """Update the last_updated field of the current session metadata."""
+        if not self._session_meta:
+            return
         try:
-            # Load existing session data or create new
-            if self.current_session_file.exists():
-                with open(self.current_session_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-            else:
-                session_data = {
-                    "session_id": self.current_session_file.stem,
-                    "model": model,
-                    "start_time": datetime.now().isoformat(),
-                    "messages": []
-                }
+            self._session_meta["last_updated"] = datetime.now().isoformat(timespec='seconds')
+            self._write_session_meta()
+        except Exception as e:
+            print(f"Warning: Failed to update session metadata: {e}")
+    
+    def _read_session_header(self, session_file: Path) -> Dict[str, Any]:
+        """Read the session headers without parsing the messages when possible."""
+        if session_file.suffix in (".jsonl", _COMPRESSED_SUFFIX):
+            meta_file = self._get_meta_file(session_file)
+            if not meta_file.exists():
+                return {"session_id": self._get_uncompressed_file(session_file).stem}
+            with open(meta_file, 'rb') as f:
+                data = loads(f.read())
+            # Only compressed sessions record their final message count
+            if session_file.suffix == ".jsonl":
+                data.pop("message_count", None)
+            return data
+        
+        # Legacy archives write their headers before the messages array
+        with open(session_file, 'rb') as f:
+            head = f.read(2048)
+        messages_pos = head.find(b'"messages"')
+        if messages_pos != -1:
+            try:
+                header, _ = json.JSONDecoder().raw_decode(
+                    (head[:messages_pos].rstrip().rstrip(b',') + b'}').decode('utf-8'))
+                if "message_count" in header:
+                    return header
+            except ValueError:
+                pass
+        
+        data = loads(session_file.read_bytes())
+        data.setdefault("message_count", len(data.get("messages", [])))
+        data.pop("messages", None)
+        return data
+    
+    def _iter_session_messages(self, session_file: Path, start: int = 0,
+                               stop: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Yield the messages of a session in [start, stop), one line at a time for JSONL files."""
+        if session_file.suffix == ".json":
+            messages = loads(session_file.read_bytes()).get("messages", [])
+            yield from itertools.islice(messages, start, stop)
+            return
+        
+        with self._open_session(session_file) as f:
+            # Lines outside the range are skipped without being decoded
+            lines = (line for line in f if line.strip())
+            for line in itertools.islice(lines, start, stop):
+                try:
+                    yield loads(line)
+                except ValueError:
+                    # Skip a line torn by an interrupted write
+                    continue
+    
+    def _count_session_messages(self, session_file: Path) -> int:
+        """Count the messages of a JSONL session without decoding them."""
+        with self._open_session(session_file) as f:
+            return sum(1 for line in f if line.strip())
+    
+    def compress_old_sessions(self):
+        """Gzip JSONL sessions that have not been modified for _COMPRESS_AFTER_DAYS."""
+        cutoff = time.time() - _COMPRESS_AFTER_DAYS * 86400
+        for session_file in self._scan_sessions():
+            if session_file.suffix != ".jsonl" or session_file == self.current_session_file:
+                continue
+            try:
+                st = session_file.stat()
+                if st.st_mtime >= cutoff:
+                    continue
+                
+                # Record the final count so listing never has to decompress
+                meta = self._read_session_header(session_file)
+                meta["message_count"] = self._count_session_messages(session_file)
+                
+                import gzip
+                compressed_file = session_file.with_name(session_file.name + _COMPRESSED_SUFFIX)
+                replace_file(compressed_file, gzip.compress(session_file.read_bytes()))
+                # Keep the modification time so the listing order does not change
+                os.utime(compressed_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+                replace_file(self._get_meta_file(session_file), dumpb(meta))
+                session_file.unlink()
+            except Exception as e:
+                print(f"Warning: Failed to compress {session_file.name}: {e}")
+    
+    def _archive_message(self, message: Message, model: str):
+        """Append a single message to the current session file."""
+        try:
+            if not self.current_session_file:
+                self._start_session(model, message.timestamp)
             
-            # Add the new message
-            session_data["messages"].append(message)
-            session_data["last_updated"] = datetime.now().isoformat()
+            if self._append_path != self.current_session_file:
+                self._close_append_fd()
+                self._append_fd = open_append(self.current_session_file)
+                self._append_path = self.current_session_file
+            write_all(self._append_fd, dumpb(message.to_dict()) + b"\n")
             
-            # Save to file
-            with open(self.current_session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
+            # Appending changes the file mtime without touching the directory
+            self._scan_cache = None
                 
         except Exception as e:
             print(f"Warning: Failed to archive message: {e}")
     
-    def _archive_full_conversation(self, conversation_history: List[Dict[str, str]], model: str):
+    def _archive_full_conversation(self, conversation_history: List[Message], model: str) -> bool:
         """Archive the complete conversation to a session file."""
-        if not self.current_session_file:
-            self.current_session_file = self.archive_dir / self._get_session_filename()
-        
+        # Called from the thread that changes the history (the background writer only
+        # receives single messages), so the list is serialized without a copy
+        return self._write_session_lines(
+            (dumpb(message.to_dict()) for message in conversation_history), model,
+            conversation_history[0].timestamp if conversation_history else None)
+    
+    def _write_session_lines(self, lines: Iterable[bytes], model: str, start_timestamp: Optional[float] = None) -> bool:
+        """Replace the current session file with the given encoded messages, one per line."""
         try:
-            session_data = {
-                "session_id": self.current_session_file.stem,
-                "model": model,
-                "start_time": datetime.now().isoformat(),
-                "last_updated": datetime.now().isoformat(),
-                "message_count": len(conversation_history),
-                "messages": conversation_history.copy()
-            }
+            if not self.current_session_file:
+                self._start_session(model, start_timestamp)
             
-            with open(self.current_session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
+            # The replaced file gets a new inode, so the append descriptor must be reopened
+            self._close_append_fd()
+            replace_file(self.current_session_file, b"".join(line + b"\n" for line in lines))
+            
+            self._session_meta["model"] = model
+            self._flush_session_meta()
+            return True
                 
         except Exception as e:
             print(f"Warning: Failed to archive conversation: {e}")
+            return False
+    
+    def _close_append_fd(self):
+        """Close the append descriptor of the session file, if open."""
+        if self._append_fd is not None:
+            os.close(self._append_fd)
+            self._append_fd = None
+            self._append_path = None
     
-    def _archive_worker(self, conversation_history: List[Dict[str, str]], model: str):
-        """Background worker for periodic archiving."""
-        while not self.stop_archive:
+    def _archive_worker(self):
+        """Background writer appending queued messages to the session file."""
+        while True:
+            # Sleeps until a message arrives; None asks the writer to stop
+            item = self._write_queue.get()
             try:
-                if conversation_history and self.auto_archive:
-                    self._archive_full_conversation(conversation_history, model)
-                time.sleep(self.archive_interval)
-            except Exception as e:
-                print(f"Archive worker error: {e}")
-                time.sleep(self.archive_interval)
+                if item is None:
+                    return
+                self._archive_message(*item)
+            finally:
+                self._write_queue.task_done()
+    
+    def _is_worker_running(self) -> bool:
+        """Check whether the background writer is running."""
+        return self.archive_thread is not None and self.archive_thread.is_alive()
+    
+    def _wait_for_pending_writes(self):
+        """Block until every queued message has been written."""
+        if self._is_worker_running():
+            self._write_queue.join()
     
-    def start_auto_archive(self, conversation_history: List[Dict[str, str]], model: str):
-        """Start the automatic archiving thread."""
-        if self.archive_thread and self.archive_thread.is_alive():
+    def start_auto_archive(self):
+        """Start the background archive writer."""
+        if self._is_worker_running():
             return
         
-        self.stop_archive = False
-        self.archive_thread = threading.Thread(
-            target=self._archive_worker, 
-            args=(conversation_history, model),
-            daemon=True
-        )
+        self.archive_thread = threading.Thread(target=self._archive_worker, daemon=True)
         self.archive_thread.start()
     
     def stop_auto_archive(self):
-        """Stop the automatic archiving thread."""
-        self.stop_archive = True
-        if self.archive_thread:
-            self.archive_thread.join(timeout=1)
+        """Stop the background archive writer once pending messages are written."""
+        if self._is_worker_running():
+            # Queued after any pending messages, so those are written first
+            self._write_queue.put(None)
+            self.archive_thread.join()
+        self._close_append_fd()
+        self._flush_session_meta()
     
-    def archive_message(self, message: Dict[str, str], model: str):
+    def archive_message(self, message: Message, model: str):
         """Archive a single message if auto-archiving is enabled."""
-        if self.auto_archive:
+        if not self.auto_archive:
+            return
+        
+        if self._is_worker_running():
+            self._write_queue.put((message, model))
+        else:
             self._archive_message(message, model)
     
-    def manual_archive_save(self, conversation_history: List[Dict[str, str]], model: str) -> str:
+    def manual_archive_save(self, conversation_history: List[Message], model: str) -> str:
         """Manually save the current conversation."""
         if not conversation_history:
             return "No conversation to save."
         
         try:
+            self._wait_for_pending_writes()
             self._archive_full_conversation(conversation_history, model)
             return f"Conversation saved to: {self.current_session_file.name}"
         except Exception as e:
@@ -129,15 +366,19 @@ class ArchiveManager:
     
     def clear_current_session(self):
         """Clear current session and start a new one."""
+        self._wait_for_pending_writes()
+        self._close_append_fd()
+        self._flush_session_meta()
         self.current_session_file = None
+        self._session_meta = None
         return "Current session cleared. New conversation will start fresh."
     
-    def toggle_auto_archive(self, conversation_history: List[Dict[str, str]], model: str) -> str:
+    def toggle_auto_archive(self) -> str:
         """Toggle auto-archiving on/off."""
         self.auto_archive = not self.auto_archive
         
         if self.auto_archive:
-            self.start_auto_archive(conversation_history, model)
+            self.start_auto_archive()
             return "Auto-archiving enabled. Conversations will be saved automatically."
         else:
             self.stop_auto_archive()
@@ -148,120 +389,162 @@ class ArchiveManager:
         if not self.archive_dir.exists():
             return "No archive directory found"
         
-        archive_files = list(self.archive_dir.glob("session_*.json"))
+        archive_files = self._scan_sessions()
         if not archive_files:
             return "No archived conversations found"
         
-        # Sort by modification time (newest first)
-        archive_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        # Forget summaries of sessions that no longer exist
+        for file_path in self._summary_cache.keys() - set(archive_files):
+            del self._summary_cache[file_path]
         
-        result = "Archived Conversations:\n"
+        lines = ["Archived Conversations:\n"]
         for i, file_path in enumerate(archive_files, 1):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                session_id = data.get('session_id', file_path.stem)
-                message_count = data.get('message_count', len(data.get('messages', [])))
-                start_time = data.get('start_time', 'Unknown')
-                model = data.get('model', 'Unknown')
-                
-                # Format timestamp
-                try:
-                    dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-                except:
-                    formatted_time = start_time
+                summary = self._get_session_summary(file_path)
                 
-                result += f"{i:2d}. {session_id}\n"
-                result += f"    Model: {model} | Messages: {message_count} | Started: {formatted_time}\n"
+                lines.append(f"{i:2d}. {summary['session_id']}\n")
+                lines.append(f"    Model: {summary['model']} | Messages: {summary['message_count']}"
+                             f" | Started: {summary['start_time']}\n")
                 
             except Exception as e:
-                result += f"{i:2d}. {file_path.name} (Error reading: {e})\n"
+                lines.append(f"{i:2d}. {file_path.name} (Error reading: {e})\n")
         
-        return result
+        return "".join(lines)
     
-    def view_archived_conversation(self, session_id: str) -> str:
-        """View a specific archived conversation."""
-        if not session_id:
-            return "Please provide a session ID. Use /archive-list to see available sessions."
-        
-        # Try to find the session file
-        session_file = None
+    def _find_session_file(self, session_id: str) -> Optional[Path]:
+        """Find a session file by list index or partial name."""
         if session_id.isdigit():
             # If it's a number, treat it as an index from the list
-            archive_files = sorted(self.archive_dir.glob("session_*.json"), 
-                                 key=lambda x: x.stat().st_mtime, reverse=True)
-            try:
-                index = int(session_id) - 1
-                if 0 <= index < len(archive_files):
-                    session_file = archive_files[index]
-            except ValueError:
-                pass
+            archive_files = self._scan_sessions()
+            index = int(session_id) - 1
+            if 0 <= index < len(archive_files):
+                return archive_files[index]
+        
+        return self._match_session_name(session_id)
+    
+    def _match_session_name(self, session_id: str) -> Optional[Path]:
+        """Find a session file by name, preferring an exact match over a partial one."""
+        partial_match = None
+        for file_path in self._scan_sessions():
+            # Sessions started in the same second differ only by a suffix (session_..._1)
+            name = self._get_uncompressed_file(file_path).stem
+            if name == session_id:
+                return file_path
+            if partial_match is None and session_id in name:
+                partial_match = file_path
+        return partial_match
+    
+    def iter_archived_messages(self, session_id: str, page: Optional[int] = None) -> Iterator[str]:
+        """Yield the formatted view of an archived conversation (or one page of it), one line at a time."""
+        session_file = self._find_session_file(session_id)
+        if not session_file or not session_file.exists():
+            yield f"Session '{session_id}' not found. Use /archive-list to see available sessions."
+            return
         
-        if not session_file:
-            # Try to find by partial name match
-            for file_path in self.archive_dir.glob("session_*.json"):
-                if session_id in file_path.stem:
-                    session_file = file_path
-                    break
+        data = self._read_session_header(session_file)
+        message_count = data.get('message_count')
+        if message_count is None:
+            message_count = self._count_session_messages(session_file)
         
+        page_count = max(1, -(-message_count // _VIEW_PAGE_SIZE))
+        if page is not None and page > page_count:
+            yield f"Page {page} does not exist: this conversation has {page_count} page(s)."
+            return
+        
+        yield f"Session: {data.get('session_id', 'Unknown')}\n"
+        yield f"Model: {data.get('model', 'Unknown')}\n"
+        yield f"Messages: {message_count}\n"
+        yield f"Started: {data.get('start_time', 'Unknown')}\n"
+        yield f"Last Updated: {data.get('last_updated', 'Unknown')}\n"
+        
+        start, stop = 0, None
+        if page is not None:
+            yield f"Page: {page}/{page_count}\n"
+            start = (page - 1) * _VIEW_PAGE_SIZE
+            stop = start + _VIEW_PAGE_SIZE
+        yield "=" * 50 + "\n\n"
+        
+        messages = self._iter_session_messages(session_file, start, stop)
+        for i, msg in enumerate(messages, start + 1):
+            role = msg.get('role', 'unknown').upper()
+            content = msg.get('content', '')
+            timestamp = msg.get('timestamp', '')
+            
+            # Truncate long messages
+            if len(content) > 200:
+                content = content[:200] + "..."
+            
+            yield f"{i:3d}. [{role}] {content}\n"
+            if timestamp:
+                yield f"     Time: {timestamp}\n"
+            yield "\n"
+    
+    def view_archived_conversation(self, session_id: str, page: Optional[int] = None) -> str:
+        """View a specific archived conversation, or one page of it."""
+        if not session_id:
+            return "Please provide a session ID. Use /archive-list to see available sessions."
+        if page is not None and page < 1:
+            return "Page numbers start at 1."
+        
+        try:
+            return "".join(self.iter_archived_messages(session_id, page))
+        except Exception as e:
+            return f"Error reading session file: {e}"
+    
+    def export_archived_conversation(self, session_id: str, filename: Optional[str] = None) -> str:
+        """Export an archived conversation to a single indented JSON file."""
+        if not session_id:
+            return "Please provide a session ID. Use /archive-list to see available sessions."
+        
+        session_file = self._find_session_file(session_id)
         if not session_file or not session_file.exists():
             return f"Session '{session_id}' not found. Use /archive-list to see available sessions."
         
         try:
-            with open(session_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            result = f"Session: {data.get('session_id', 'Unknown')}\n"
-            result += f"Model: {data.get('model', 'Unknown')}\n"
-            result += f"Messages: {data.get('message_count', 0)}\n"
-            result += f"Started: {data.get('start_time', 'Unknown')}\n"
-            result += f"Last Updated: {data.get('last_updated', 'Unknown')}\n"
-            result += "=" * 50 + "\n\n"
-            
-            messages = data.get('messages', [])
-            for i, msg in enumerate(messages, 1):
-                role = msg.get('role', 'unknown').upper()
-                content = msg.get('content', '')
-                timestamp = msg.get('timestamp', '')
-                
-                # Truncate long messages
-                if len(content) > 200:
-                    content = content[:200] + "..."
-                
-                result += f"{i:3d}. [{role}] {content}\n"
-                if timestamp:
-                    result += f"     Time: {timestamp}\n"
-                result += "\n"
-            
-            return result
+            data = self._read_session_header(session_file)
+            data["messages"] = list(self._iter_session_messages(session_file))
+            data["message_count"] = len(data["messages"])
             
+            export_file = Path(filename or f"{self._get_uncompressed_file(session_file).stem}_export.json")
+            replace_file(export_file, dumpb(data, indent=True))
+            return f"Conversation exported to {export_file}"
         except Exception as e:
-            return f"Error reading session file: {e}"
+            return f"Error exporting session: {e}"
     
     def resume_archived_conversation(self, session_id: str) -> tuple[str, List[Dict[str, str]]]:
         """Resume a specific archived conversation and return the messages."""
+        if not session_id:
+            return "Please provide a session ID. Use /archive-list to see available sessions.", []
+        
         # Find the corresponding archive file
-        session_file = None
-        for file_path in self.archive_dir.glob("session_*.json"):
-            if session_id in file_path.stem:
-                session_file = file_path
-                break
+        session_file = self._match_session_name(session_id)
 
         if not session_file or not session_file.exists():
             return f"Session '{session_id}' not found. Use /archive-list to see available sessions.", []
 
         try:
-            with open(session_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            messages = data.get("messages", [])
-            self.current_session_file = session_file  # resume on the same file
+            data = self._read_session_header(session_file)
+            messages = list(self._iter_session_messages(session_file))
             
             # Use view_archived_conversation for formatted display
             formatted_view = self.view_archived_conversation(session_id)
-            return f"✅ Resumed conversation '{data.get('session_id', session_file.stem)}' with {len(messages)} messages.\n\n{formatted_view}", messages
+            
+            # Resume on the same session, migrating legacy and compressed archives to plain JSON Lines
+            self._wait_for_pending_writes()
+            self.current_session_file = self._get_uncompressed_file(session_file).with_suffix(".jsonl")
+            now_iso = datetime.now().isoformat(timespec='seconds')
+            self._session_meta = {
+                "session_id": data.get("session_id", self.current_session_file.stem),
+                "model": data.get("model", "Unknown"),
+                "start_time": data.get("start_time", now_iso),
+                "last_updated": data.get("last_updated", now_iso)
+            }
+            if session_file != self.current_session_file:
+                # Messages are written back as decoded, so no field or timestamp format is lost
+                if self._write_session_lines(map(dumpb, messages), self._session_meta["model"]):
+                    session_file.unlink()
+            
+            return f"✅ Resumed conversation '{self._session_meta['session_id']}' with {len(messages)} messages.\n\n{formatted_view}", messages
 
         except Exception as e:
             return f"Error resuming session: {e}", []
@@ -276,7 +559,8 @@ Archive Status:
 
 Archive Commands:
 - /archive-list        - List all archived conversations
-- /archive-view <id>   - View specific archived conversation
+- /archive-view <id> [page] - View specific archived conversation
+- /archive-export <id> [file] - Export a conversation as indented JSON
 - /archive-toggle      - Toggle auto-archiving on/off
 - /archive-save        - Manually save current conversation
 - /archive-clear       - Clear current session (start new)
@@ -4,19 +4,26 @@ Command Executor
 Handles system command execution with safety controls.
 """
 
-import subprocess
 import sys
 import os
+import locale
+import time
 import shlex
+import stat
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, List, Tuple, Optional
+
+if TYPE_CHECKING:
+    # Imported on first use at runtime
+    import subprocess
 
 
 class CommandExecutor:
     """Manages system command execution with safety controls."""
     
     # Allowed commands for security
-    ALLOWED_COMMANDS = {
+    ALLOWED_COMMANDS = frozenset({
         'cd', 'ls', 'cat', 'echo', 'pwd', 'mkdir', 'rmdir', 'touch', 
         'cp', 'mv', 'rm', 'grep', 'find', 'head', 'tail', 'wc', 'sort',
         'ps', 'top', 'df', 'du', 'free', 'uname', 'whoami', 'date',
@@ -24,18 +31,26 @@ class CommandExecutor:
         'git add', 'git commit', 'git push', 'git pull', 'git clone',
         # Windows commands
         'dir', 'type', 'copy', 'move', 'del', 'ren', 'md', 'rd'
-    }
+    })
+    _SORTED_COMMANDS = tuple(sorted(ALLOWED_COMMANDS))
+    
+    # Output beyond this size is truncated before being shown
+    MAX_OUTPUT_BYTES = 1 << 20
+    COMMAND_TIMEOUT = 30
     
     def __init__(self):
         self.current_dir = os.getcwd()
     
-    def is_command_allowed(self, command: str) -> bool:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def is_command_allowed(command: str) -> bool:
         """Check if a command is in the allowed list."""
         # Extract the base command (first word)
-        base_command = command.split()[0] if command.split() else ""
+        parts = command.split(None, 1)
+        base_command = parts[0] if parts else ""
         
         # Check if the base command is allowed
-        if base_command in self.ALLOWED_COMMANDS:
+        if base_command in CommandExecutor.ALLOWED_COMMANDS:
             return True
         
         # Special case for Windows cd command with /d flag
@@ -56,28 +71,86 @@ class CommandExecutor:
         if not self.is_command_allowed(command):
             return 1, "", f"Command '{command}' is not allowed for security reasons"
         
+        # Imported on first use so that startup doesn't pay for it
+        import subprocess
+        
         try:
             # Handle cd command specially as it needs to change directory
-            if command.startswith('cd '):
+            # (matched on the first word, so that a bare 'cd' goes home)
+            if command.split(None, 1)[:1] == ['cd']:
                 return self._handle_cd_command(command)
             
-            # Execute other commands
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30,
+            # Execute other commands directly, without an intermediate shell
+            if os.name == 'nt':
+                # Windows commands such as dir, copy or del are cmd.exe builtins
+                args, use_shell = command, True
+            else:
+                args, use_shell = shlex.split(command), False
+            
+            with subprocess.Popen(
+                args,
+                shell=use_shell,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 cwd=self.current_dir
-            )
+            ) as process:
+                try:
+                    if os.name == 'nt':
+                        # Pipes cannot be polled with selectors on Windows
+                        stdout, stderr = process.communicate(timeout=self.COMMAND_TIMEOUT)
+                    else:
+                        stdout, stderr = self._read_output(process)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    raise
             
-            return result.returncode, result.stdout, result.stderr
+            return process.returncode, self._decode_output(stdout), self._decode_output(stderr)
             
         except subprocess.TimeoutExpired:
-            return 1, "", "Command execution timed out after 30 seconds"
+            return 1, "", f"Command execution timed out after {self.COMMAND_TIMEOUT} seconds"
         except Exception as e:
             return 1, "", f"Error executing command: {e}"
     
+    def _read_output(self, process: "subprocess.Popen") -> Tuple[bytes, bytes]:
+        """Read stdout and stderr as they arrive, keeping at most MAX_OUTPUT_BYTES of each."""
+        import selectors
+        import subprocess
+        
+        deadline = time.monotonic() + self.COMMAND_TIMEOUT
+        buffers = {process.stdout: bytearray(), process.stderr: bytearray()}
+        
+        with selectors.DefaultSelector() as selector:
+            for pipe in buffers:
+                selector.register(pipe, selectors.EVENT_READ)
+            
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(process.args, self.COMMAND_TIMEOUT)
+                
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    # Keep draining past the limit so the command never blocks on a full pipe
+                    buffer = buffers[key.fileobj]
+                    if len(buffer) <= self.MAX_OUTPUT_BYTES:
+                        buffer += chunk
+        
+        process.wait(timeout=max(deadline - time.monotonic(), 0))
+        return bytes(buffers[process.stdout]), bytes(buffers[process.stderr])
+    
+    def _decode_output(self, data: bytes) -> str:
+        """Decode captured output once, truncating it to MAX_OUTPUT_BYTES."""
+        truncated = len(data) > self.MAX_OUTPUT_BYTES
+        if truncated:
+            data = data[:self.MAX_OUTPUT_BYTES]
+        # Same encoding and newline handling as text=True
+        text = data.decode(locale.getpreferredencoding(False), 'replace').replace('\r\n', '\n')
+        return text + "\n...[output truncated]" if truncated else text
+    
     def _handle_cd_command(self, command: str) -> Tuple[int, str, str]:
         """Handle cd command by changing the current working directory."""
         try:
@@ -90,17 +163,19 @@ class CommandExecutor:
                 new_dir = parts[1]
             
             # Resolve the path
-            if os.path.isabs(new_dir):
-                target_dir = new_dir
-            else:
-                target_dir = os.path.join(self.current_dir, new_dir)
+            new_dir = os.path.expanduser(new_dir)
+            target_dir = os.path.realpath(os.path.join(self.current_dir, new_dir))
             
             # Check if directory exists
-            if not os.path.isdir(target_dir):
+            try:
+                st = os.stat(target_dir)
+            except FileNotFoundError:
                 return 1, "", f"Directory '{target_dir}' does not exist"
+            if not stat.S_ISDIR(st.st_mode):
+                return 1, "", f"'{target_dir}' is not a directory"
             
             # Change directory
-            self.current_dir = os.path.abspath(target_dir)
+            self.current_dir = target_dir
             return 0, f"Changed directory to: {self.current_dir}", ""
             
         except Exception as e:
@@ -112,4 +187,4 @@ class CommandExecutor:
     
     def get_allowed_commands(self) -> List[str]:
         """Get list of allowed commands."""
-        return sorted(list(self.ALLOWED_COMMANDS))
+        return list(self._SORTED_COMMANDS)
@@ -4,91 +4,31 @@ Command Processor
 Handles special command parsing and routing.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
-import json
 import re
+import string
 from .approval_analyzer import ApprovalAnalyzer
+from .conversation_manager import Message
+from ._fileio import replace_file
+from ._json import dumpb, loads
 
+# [EXECUTE:command] marker, matched case-insensitively with plain string scanning
+_EXECUTE_TOKEN = '[execute:'
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
 
-class CommandProcessor:
-    """Processes special commands and routes them to appropriate handlers."""
-    
-    def __init__(self, ai_client, command_executor, archive_manager):
-        self.ai_client = ai_client
-        self.command_executor = command_executor
-        self.archive_manager = archive_manager
-        self.approval_analyzer = ApprovalAnalyzer(ai_client)
-        self.pending_commands = []  # Store commands waiting for approval
-    
-    def process_command(self, user_input: str, conversation_history: List[Dict[str, str]]) -> Optional[str]:
-        """Process special commands and return result or None if not a command."""
-        command = user_input.strip().lower()
-        
-        if command in ['/help', '/h']:
-            return self._show_help()
-        elif command in ['/commands', '/cmd']:
-            return self._show_commands()
-        elif command.startswith('/execute '):
-            command_to_execute = user_input[9:].strip()
-            return self._execute_command_with_approval(command_to_execute)
-        elif command.startswith('/save'):
-            filename = user_input[6:].strip() or None
-            return self._save_conversation(conversation_history, filename)
-        elif command.startswith('/load '):
-            filename = user_input[6:].strip()
-            return self._load_conversation(filename)
-        elif command in ['/clear', '/c']:
-            return "Conversation history cleared"
-        elif command in ['/history', '/hist']:
-            return self._show_history(conversation_history)
-        elif command.startswith('/model '):
-            new_model = user_input[7:].strip()
-            return self.ai_client.change_model(new_model)
-        elif command in ['/info', '/i']:
-            return self._show_info(conversation_history)
-        elif command == '/approve':
-            return self._handle_command_approval()
-        elif command in ['/archive', '/a']:
-            return self.archive_manager.get_archive_status()
-        elif command == '/archive-list':
-            return self.archive_manager.list_archived_conversations()
-        elif command.startswith('/archive-view '):
-            session_id = user_input[14:].strip()
-            return self.archive_manager.view_archived_conversation(session_id)
-        elif command == '/archive-toggle':
-            return self.archive_manager.toggle_auto_archive(conversation_history, self.ai_client.model)
-        elif command == '/archive-save':
-            return self.archive_manager.manual_archive_save(conversation_history, self.ai_client.model)
-        elif command == '/archive-clear':
-            return self.archive_manager.clear_current_session()
-        elif command.startswith('/archive-resume '):
-            session_id = user_input[16:].strip()
-            message, messages = self.archive_manager.resume_archived_conversation(session_id)
-            if messages:
-                # Set the conversation history to the resumed messages
-                conversation_history.clear()
-                conversation_history.extend(messages)
-            return message
-        elif command in ['/quit', '/q']:
-            return "quit"
-        else:
-            # Check if the input contains [EXECUTE:...] commands
-            execute_commands = self._extract_execute_commands(user_input)
-            if execute_commands:
-                return self._handle_execute_commands(execute_commands)
-            return None  # Not a special command
-    
-    def _show_help(self) -> str:
-        """Show available commands."""
-        return """
+# Fallbacks for EXECUTE: markers without brackets
+_EXECUTE_FALLBACK_RE = re.compile(r'EXECUTE:\s*([^E\n]+?)(?=\s+EXECUTE:|$)', re.IGNORECASE)
+_EXECUTE_SIMPLE_FALLBACK_RE = re.compile(r'EXECUTE:\s*([^\n]+?)(?=\s+EXECUTE:|$)', re.IGNORECASE)
+
+_HELP_TEXT = """
 Available commands:
 - /help or /h          - Show this help message
 - /commands or /cmd    - List available system commands
 - /execute <command>   - Execute a system command
 - /approve             - Approve pending command execution
-- /save [filename]     - Save conversation to file
+- /save [filename]     - Save conversation to file (.json, or .mpk for MessagePack)
 - /load <filename>     - Load conversation from file
 - /clear or /c         - Clear conversation history
 - /history or /hist    - Show conversation history
@@ -99,7 +39,8 @@ Available commands:
 Archive commands:
 - /archive or /a       - Show archive status and commands
 - /archive-list        - List archived conversations
-- /archive-view <id>   - View specific archived conversation
+- /archive-view <id> [page] - View an archived conversation (50 messages per page)
+- /archive-export <id> [file] - Export a conversation as indented JSON
 - /archive-toggle      - Toggle auto-archiving on/off
 - /archive-save        - Manually save current conversation
 
@@ -108,20 +49,144 @@ Just type your message to chat with the AI assistant.
 The AI can suggest commands using [EXECUTE:command] format.
 You can approve them with /approve or type 'yes'/'oui' to confirm.
 """
+
+# Status strings, also used by the main loop and TerminalAIAssistant.clear_history
+QUIT = "quit"
+HISTORY_CLEARED = "Conversation history cleared"
+
+# Conversations saved with this extension use length-prefixed MessagePack (requires msgspec)
+_MSGPACK_SUFFIX = ".mpk"
+
+
+class CommandProcessor:
+    """Processes special commands and routes them to appropriate handlers."""
+    
+    def __init__(self, ai_client, command_executor, archive_manager):
+        self.ai_client = ai_client
+        self.command_executor = command_executor
+        self.archive_manager = archive_manager
+        self.approval_analyzer = ApprovalAnalyzer(ai_client)
+        self.pending_commands = []  # Store commands waiting for approval
+        self._last_saves: Dict[Path, Tuple[Any, int]] = {}  # path -> (history fingerprint, file mtime)
+        
+        # Commands matched on the whole input: handler(conversation_history)
+        self._commands = {
+            '/help': lambda history: self._show_help(),
+            '/h': lambda history: self._show_help(),
+            '/commands': lambda history: self._show_commands(),
+            '/cmd': lambda history: self._show_commands(),
+            '/clear': self._clear_history,
+            '/c': self._clear_history,
+            '/history': self._show_history,
+            '/hist': self._show_history,
+            '/info': self._show_info,
+            '/i': self._show_info,
+            '/approve': lambda history: self._handle_command_approval(),
+            '/archive': lambda history: self.archive_manager.get_archive_status(),
+            '/a': lambda history: self.archive_manager.get_archive_status(),
+            '/archive-list': lambda history: self.archive_manager.list_archived_conversations(),
+            '/archive-toggle': lambda history: self.archive_manager.toggle_auto_archive(),
+            '/archive-save': lambda history: self.archive_manager.manual_archive_save(history, self.ai_client.model),
+            '/archive-clear': lambda history: self.archive_manager.clear_current_session(),
+            '/quit': lambda history: QUIT,
+            '/q': lambda history: QUIT,
+        }
+        
+        # Commands matched on their first word: handler(argument, conversation_history)
+        self._argument_commands = {
+            '/execute': lambda argument, history: self._execute_command_with_approval(argument),
+            '/save': lambda argument, history: self._save_conversation(history, argument or None),
+            '/load': self._load_into_history,
+            '/model': lambda argument, history: self._change_model(argument),
+            '/archive-view': self._view_archived_conversation,
+            '/archive-resume': self._resume_archived_conversation,
+            '/archive-export': self._export_archived_conversation,
+        }
+    
+    def process_command(self, user_input: str, conversation_history: List[Message]) -> Optional[str]:
+        """Process special commands and return result or None if not a command."""
+        stripped = user_input.strip()
+        
+        # Chat messages skip the command tables entirely
+        if stripped.startswith('/'):
+            # Only the command token needs lowercasing, not the whole message
+            head, sep, argument = stripped.partition(' ')
+            command = head.lower()
+            
+            if not sep:
+                handler = self._commands.get(command)
+                if handler:
+                    return handler(conversation_history)
+            
+            argument_handler = self._argument_commands.get(command)
+            if argument_handler:
+                return argument_handler(argument.strip(), conversation_history)
+        
+        # Check if the input contains [EXECUTE:...] commands
+        execute_commands = self._extract_execute_commands(user_input)
+        if execute_commands:
+            return self._handle_execute_commands(execute_commands)
+        return None  # Not a special command
+    
+    def _resume_archived_conversation(self, session_id: str, conversation_history: List[Message]) -> str:
+        """Resume an archived conversation into the conversation history."""
+        message, messages = self.archive_manager.resume_archived_conversation(session_id)
+        if messages:
+            # Set the conversation history to the resumed messages
+            conversation_history.clear()
+            conversation_history.extend(Message.from_dict(message) for message in messages)
+        return message
+    
+    def _load_into_history(self, filename: str, conversation_history: List[Message]) -> str:
+        """Load a saved conversation into the conversation history."""
+        if not filename:
+            return "Please provide a file name: /load <filename>"
+        message, messages = self._load_conversation(filename)
+        if messages:
+            # Set the conversation history to the loaded messages
+            conversation_history.clear()
+            conversation_history.extend(Message.from_dict(message) for message in messages)
+        return message
+    
+    def _change_model(self, model: str) -> str:
+        """Change the AI model, or show the current one when no model is given."""
+        if not model:
+            return f"Current model: {self.ai_client.model}. Use /model <name> to change it."
+        return self.ai_client.change_model(model)
+    
+    def _view_archived_conversation(self, argument: str, conversation_history: List[Message]) -> str:
+        """View an archived conversation, optionally a single page of it."""
+        session_id, _, page = argument.partition(' ')
+        page = page.strip()
+        if page and not page.isdigit():
+            return f"Invalid page number: {page}"
+        return self.archive_manager.view_archived_conversation(session_id, int(page) if page else None)
+    
+    def _export_archived_conversation(self, argument: str, conversation_history: List[Message]) -> str:
+        """Export an archived conversation, optionally to a given file name."""
+        session_id, _, filename = argument.partition(' ')
+        return self.archive_manager.export_archived_conversation(session_id, filename.strip() or None)
     
-    def _show_history(self, conversation_history: List[Dict[str, str]]) -> str:
+    def _clear_history(self, conversation_history: List[Message]) -> str:
+        """Clear the conversation history in place."""
+        conversation_history.clear()
+        return HISTORY_CLEARED
+    
+    def _show_help(self) -> str:
+        """Show available commands."""
+        return _HELP_TEXT
+    
+    def _show_history(self, conversation_history: List[Message]) -> str:
         """Show conversation history."""
         if not conversation_history:
             return "No conversation history"
         
-        history_text = "Conversation History:\n"
-        for i, msg in enumerate(conversation_history, 1):
-            role = msg['role'].upper()
-            content = msg['content'][:100] + "..." if len(msg['content']) > 100 else msg['content']
-            history_text += f"{i}. [{role}] {content}\n"
-        return history_text
+        return "Conversation History:\n" + "".join(
+            f"{i}. [{msg.role.upper()}] {msg.content if len(msg.content) <= 100 else f'{msg.content[:100]}...'}\n"
+            for i, msg in enumerate(conversation_history, 1)
+        )
     
-    def _show_info(self, conversation_history: List[Dict[str, str]]) -> str:
+    def _show_info(self, conversation_history: List[Message]) -> str:
         """Show assistant information."""
         return f"""
 Terminal AI Assistant
@@ -134,23 +199,47 @@ Auto-Archive: {'Enabled' if self.archive_manager.auto_archive else 'Disabled'}
 Current Session: {self.archive_manager.current_session_file.name if self.archive_manager.current_session_file else 'None'}
 """
     
-    def _save_conversation(self, conversation_history: List[Dict[str, str]], filename: str = None) -> str:
-        """Save conversation history to a JSON file."""
+    def _save_conversation(self, conversation_history: List[Message], filename: str = None) -> str:
+        """Save conversation history to a JSON or MessagePack file."""
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"conversation_{timestamp}.json"
         
         filepath = Path(filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(conversation_history, f, indent=2, ensure_ascii=False)
         
+        # Skip the write when this history was already saved to an untouched file
+        fingerprint = (len(conversation_history),
+                       conversation_history[-1].timestamp if conversation_history else None)
+        try:
+            if self._last_saves.get(filepath) == (fingerprint, filepath.stat().st_mtime_ns):
+                return f"Conversation unchanged since last save to {filepath}"
+        except OSError:
+            pass
+        
+        messages = [message.to_dict() for message in conversation_history]
+        if filepath.suffix == _MSGPACK_SUFFIX:
+            try:
+                import msgspec
+            except ImportError:
+                return f"Saving {_MSGPACK_SUFFIX} files requires msgspec (pip install msgspec)"
+            payload = msgspec.msgpack.encode(messages)
+            replace_file(filepath, len(payload).to_bytes(4, 'big') + payload)
+        else:
+            replace_file(filepath, dumpb(messages))
+        
+        self._last_saves[filepath] = (fingerprint, filepath.stat().st_mtime_ns)
         return f"Conversation saved to {filepath}"
     
     def _load_conversation(self, filename: str) -> tuple[str, List[Dict[str, str]]]:
-        """Load conversation history from a JSON file."""
+        """Load conversation history from a JSON or MessagePack file."""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                conversation_history = json.load(f)
+            if Path(filename).suffix == _MSGPACK_SUFFIX:
+                import msgspec
+                data = Path(filename).read_bytes()
+                length = int.from_bytes(data[:4], 'big')
+                conversation_history = msgspec.msgpack.Decoder(List[Dict[str, str]]).decode(data[4:4 + length])
+            else:
+                conversation_history = loads(Path(filename).read_bytes())
             return f"Loaded conversation from {filename}", conversation_history
         except Exception as e:
             return f"Error loading conversation: {e}", []
@@ -160,23 +249,36 @@ Current Session: {self.archive_manager.current_session_file.name if self.archive
         commands = self.command_executor.get_allowed_commands()
         return f"Available system commands:\n" + "\n".join(f"  - {cmd}" for cmd in commands)
     
-    def _extract_execute_commands(self, text: str) -> List[str]:
-        """Extract [EXECUTE:command] patterns from text."""
+    def _extract_execute_commands(self, text: str, brackets_only: bool = False) -> List[str]:
+        """Extract [EXECUTE:command] patterns from text, with bare EXECUTE: fallbacks unless brackets_only."""
+        # ASCII-only lowercasing keeps the indexes aligned with the original text
+        lowered = text.translate(_ASCII_LOWER)
+        
         # First try the correct format with brackets
-        pattern = r'\[EXECUTE:([^\]]+)\]'
-        matches = re.findall(pattern, text, re.IGNORECASE)
+        matches = []
+        start = lowered.find(_EXECUTE_TOKEN)
+        while start != -1:
+            start += len(_EXECUTE_TOKEN)
+            end = text.find(']', start)
+            if end == -1:
+                break
+            if end > start:
+                matches.append(text[start:end])
+                start = end + 1
+            start = lowered.find(_EXECUTE_TOKEN, start)
         if matches:
             return [match.strip() for match in matches]
         
+        if brackets_only or 'execute:' not in lowered:
+            return []
+        
         # Fallback: try to detect EXECUTE: without brackets (for robustness)
         # This pattern captures the command until the next EXECUTE: or end of line
-        pattern_fallback = r'EXECUTE:\s*([^E\n]+?)(?=\s+EXECUTE:|$)'
-        matches_fallback = re.findall(pattern_fallback, text, re.IGNORECASE)
+        matches_fallback = _EXECUTE_FALLBACK_RE.findall(text)
         
         # If no matches with the complex pattern, try a simpler one
         if not matches_fallback:
-            pattern_simple = r'EXECUTE:\s*([^\n]+?)(?=\s+EXECUTE:|$)'
-            matches_fallback = re.findall(pattern_simple, text, re.IGNORECASE)
+            matches_fallback = _EXECUTE_SIMPLE_FALLBACK_RE.findall(text)
         
         if matches_fallback:
             return [match.strip() for match in matches_fallback]
@@ -191,28 +293,30 @@ Current Session: {self.archive_manager.current_session_file.name if self.archive
         # Store commands for approval
         self.pending_commands = commands
         
-        result = "The AI suggested executing these commands:\n"
-        for i, cmd in enumerate(commands, 1):
-            result += f"{i}. {cmd}\n"
-        
-        result += "\nType 'yes'/'oui' or use /approve to execute them."
-        return result
+        lines = ["The AI suggested executing these commands:\n"]
+        lines.extend(f"{i}. {cmd}\n" for i, cmd in enumerate(commands, 1))
+        lines.append("\nType 'yes'/'oui' or use /approve to execute them.")
+        return "".join(lines)
     
     def _execute_command_with_approval(self, command: str) -> str:
         """Execute a command with approval."""
+        if not command:
+            return "Please provide a command: /execute <command>"
         if not self.command_executor.is_command_allowed(command):
             return f"Command '{command}' is not allowed for security reasons"
         
         return_code, stdout, stderr = self.command_executor.execute_command(command)
         
-        result = f"Executed: {command}\n"
-        result += f"Exit code: {return_code}\n"
+        return self._format_execution(f"Executed: {command}", return_code, stdout, stderr)
+    
+    def _format_execution(self, header: str, return_code: int, stdout: str, stderr: str) -> str:
+        """Format the result of an executed command."""
+        parts = [f"{header}\nExit code: {return_code}\n"]
         if stdout:
-            result += f"Output:\n{stdout}\n"
+            parts.append(f"Output:\n{stdout}\n")
         if stderr:
-            result += f"Error:\n{stderr}\n"
-        
-        return result
+            parts.append(f"Error:\n{stderr}\n")
+        return "".join(parts)
     
     def _handle_command_approval(self) -> str:
         """Handle command approval."""
@@ -234,14 +338,7 @@ Current Session: {self.archive_manager.current_session_file.name if self.archive
             
             return_code, stdout, stderr = self.command_executor.execute_command(command)
             
-            result = f"✅ Executed: {command}\n"
-            result += f"Exit code: {return_code}\n"
-            if stdout:
-                result += f"Output:\n{stdout}\n"
-            if stderr:
-                result += f"Error:\n{stderr}\n"
-            
-            results.append(result)
+            results.append(self._format_execution(f"✅ Executed: {command}", return_code, stdout, stderr))
         
         # Clear pending commands
         self.pending_commands = []
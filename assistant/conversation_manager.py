@@ -4,37 +4,76 @@ Conversation Manager
 Handles conversation history and message management.
 """
 
+import sys
+import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+
+def iso_timestamp(timestamp: Optional[float]) -> str:
+    """Format an epoch timestamp as a local ISO 8601 string."""
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Parse a saved timestamp (ISO string or epoch number) back to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class Message:
+    """A single conversation message."""
+    
+    __slots__ = ("role", "content", "timestamp")
+    
+    def __init__(self, role: str, content: str, timestamp: Optional[float]):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+    
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={self.content!r}, timestamp={self.timestamp!r})"
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Convert to the dict form used in saved and archived files."""
+        return {"role": self.role, "content": self.content, "timestamp": iso_timestamp(self.timestamp)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        """Build a message from its saved dict form."""
+        # Interned so that loaded messages share one string per role, like those created from literals
+        return cls(sys.intern(str(data.get("role", ""))), data.get("content", ""), parse_timestamp(data.get("timestamp")))
 
 
 class ConversationManager:
     """Manages conversation history and message handling."""
     
     def __init__(self):
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history: List[Message] = []
     
-    def add_message(self, role: str, content: str) -> Dict[str, str]:
+    def add_message(self, role: str, content: str) -> Message:
         """Add a message to conversation history."""
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        }
+        message = Message(role, content, time.time())
         self.conversation_history.append(message)
         return message
     
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
     
-    def get_history(self) -> List[Dict[str, str]]:
-        """Get conversation history."""
-        return self.conversation_history.copy()
+    def get_history(self) -> List[Message]:
+        """Get the live conversation history; callers needing a snapshot should copy it."""
+        return self.conversation_history
     
-    def set_history(self, history: List[Dict[str, str]]):
-        """Set conversation history."""
-        self.conversation_history = history.copy()
+    def set_history(self, history: List[Dict[str, Any]]):
+        """Set conversation history from saved message dicts."""
+        self.conversation_history[:] = [Message.from_dict(message) for message in history]
     
     def get_history_length(self) -> int:
         """Get number of messages in history."""
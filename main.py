@@ -6,11 +6,39 @@ A command-line AI assistant that integrates with Ollama and can execute system c
 
 import sys
 import argparse
+
+try:
+    import readline
+except ImportError:
+    # Not available on Windows; input() then works without line editing or history
+    readline = None
 from assistant import AIClient, ArchiveManager, CommandProcessor, ConversationManager, CommandExecutor
+from assistant.command_processor import HISTORY_CLEARED, QUIT
+
+
+SYSTEM_PROMPT = """You are a helpful terminal AI assistant. You can:
+- Answer questions and provide assistance
+- Execute system commands safely
+- Help with coding, debugging, and system administration
+- Provide explanations and guidance
+
+When you want to execute a system command, you MUST use the EXACT format: [EXECUTE:command] in your response.
+IMPORTANT: Always include the square brackets [ ] around EXECUTE:command
+Example: [EXECUTE:ls -la] or [EXECUTE:cd /home/user]
+The user will see this and can choose to run it."""
+
+# Sent unchanged as the first message of every request, so Ollama can reuse its cached prefix
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+_SEPARATOR = "=" * 50
+
+# Input line history, kept in the archive directory between sessions
+_INPUT_HISTORY_FILE = ".input_history"
+_INPUT_HISTORY_LENGTH = 1000
 
 
 class TerminalAIAssistant:
-    def __init__(self, model: str = "llama3.2:3B", archive_dir: str = "./conversations"):
+    def __init__(self, model: str = "llama3.2:3B", archive_dir: str = "./conversations", context_window: int = 20):
         # Initialize components
         self.ai_client = AIClient(model)
         self.command_executor = CommandExecutor()
@@ -21,6 +49,16 @@ class TerminalAIAssistant:
             self.command_executor, 
             self.archive_manager
         )
+        # Number of recent messages sent to the model (0 sends the whole history)
+        self.context_window = context_window
+        # Session-specific context, kept out of SYSTEM_PROMPT so that prefix stays identical for every session
+        self._context_messages = [{
+            "role": "system",
+            "content": "Available commands: " + ", ".join(self.command_executor.get_allowed_commands()),
+        }]
+        # History converted to Ollama message dicts, extended as new messages are added
+        self._chat_messages = []
+        self._chat_last_message = None
     
     def add_to_history(self, role: str, content: str):
         """Add a message to conversation history."""
@@ -37,38 +75,72 @@ class TerminalAIAssistant:
         return message
 
 
-    def get_ai_response(self, user_input: str) -> str:
-        """Get AI response from Ollama with full conversation context."""
+    def get_ai_response(self, user_input: str, on_token=None) -> str:
+        """Get AI response from Ollama with full conversation context, optionally streamed to on_token."""
         # Add user input to history
         self.add_to_history("user", user_input)
         
-        # Prepare messages for Ollama (including system prompt and history)
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a helpful terminal AI assistant. You can:
-- Answer questions and provide assistance
-- Execute system commands safely
-- Help with coding, debugging, and system administration
-- Provide explanations and guidance
-
-When you want to execute a system command, you MUST use the EXACT format: [EXECUTE:command] in your response.
-IMPORTANT: Always include the square brackets [ ] around EXECUTE:command
-Example: [EXECUTE:ls -la] or [EXECUTE:cd /home/user]
-The user will see this and can choose to run it.
-
-Available commands include: cd, ls, cat, echo, pwd, mkdir, touch, cp, mv, rm, grep, find, python, git, etc."""
-            }
-        ]
-        
-        # Add conversation history
-        messages.extend(self.conversation_manager.get_history())
-        
         # Get AI response
-        ai_response = self.ai_client.get_ai_response(messages)
+        ai_response = self.ai_client.get_ai_response(self._build_messages(), on_token=on_token)
         self.add_to_history("assistant", ai_response)
         return ai_response
     
+    def _get_chat_messages(self) -> list:
+        """Get the history as Ollama message dicts, converting only the messages added since the last call."""
+        history = self.conversation_manager.get_history()
+        converted = len(self._chat_messages)
+        if converted > len(history) or (converted and history[converted - 1] is not self._chat_last_message):
+            # The history was cleared, loaded or resumed since the last call
+            self._chat_messages.clear()
+            converted = 0
+        self._chat_messages.extend({"role": message.role, "content": message.content} for message in history[converted:])
+        self._chat_last_message = history[-1] if history else None
+        return self._chat_messages
+    
+    def _build_messages(self) -> list:
+        """Build the messages for Ollama: static prompt, session context, then the recent history."""
+        history = self._get_chat_messages()
+        if 0 < self.context_window < len(history):
+            # Slide the window by about half its size at a time rather than one message per turn,
+            # so the prompt keeps the same beginning (and Ollama its cached prefix) for several turns.
+            # An even step keeps the window starting on a user message. Each turn adds two messages,
+            # so the start only holds for step // 2 turns, and windows under 6 move every turn.
+            if self.context_window >= 6:
+                step = max(4, self.context_window // 4 * 2)
+            else:
+                step = min(2, self.context_window)
+            start = -(-(len(history) - self.context_window) // step) * step
+            history = history[start:]
+        messages = [_SYSTEM_MESSAGE]
+        messages.extend(self._context_messages)
+        messages.extend(history)
+        return messages
+    
+    def _load_input_history(self):
+        """Restore the input line history (up-arrow recall) from the previous sessions."""
+        if readline is None:
+            return
+        readline.set_history_length(_INPUT_HISTORY_LENGTH)
+        try:
+            readline.read_history_file(self.archive_manager.archive_dir / _INPUT_HISTORY_FILE)
+        except OSError:
+            pass
+    
+    def _save_input_history(self):
+        """Save the input line history for the next session."""
+        if readline is None:
+            return
+        try:
+            readline.write_history_file(self.archive_manager.archive_dir / _INPUT_HISTORY_FILE)
+        except OSError as e:
+            print(f"Warning: Could not save input history: {e}")
+    
+    @staticmethod
+    def _print_token(token: str):
+        """Print a piece of the AI response as soon as it is generated."""
+        sys.stdout.write(token)
+        sys.stdout.flush()
+    
     def list_commands(self):
         """List available system commands."""
         return self.command_executor.get_allowed_commands()
@@ -97,7 +169,7 @@ Available commands include: cd, ls, cat, echo, pwd, mkdir, touch, cp, mv, rm, gr
     def clear_history(self):
         """Clear conversation history."""
         self.conversation_manager.clear_history()
-        return "Conversation history cleared"
+        return HISTORY_CLEARED
     
     
     def process_command(self, user_input: str) -> str:
@@ -108,16 +180,15 @@ Available commands include: cd, ls, cat, echo, pwd, mkdir, touch, cp, mv, rm, gr
         """Main run loop."""
         print("🤖 Terminal AI Assistant")
         print("Type '/help' for available commands or start chatting!")
-        print("=" * 50)
+        print(_SEPARATOR)
         
         # Start auto-archiving
         if self.archive_manager.auto_archive:
-            self.archive_manager.start_auto_archive(
-                self.conversation_manager.get_history(), 
-                self.ai_client.model
-            )
+            self.archive_manager.start_auto_archive()
             print("📁 Auto-archiving enabled. Conversations will be saved automatically.")
         
+        self._load_input_history()
+        
         try:
             while True:
                 user_input = input("\n> ").strip()
@@ -128,7 +199,7 @@ Available commands include: cd, ls, cat, echo, pwd, mkdir, touch, cp, mv, rm, gr
                 # Check for special commands
                 command_result = self.process_command(user_input)
                 if command_result is not None:
-                    if command_result == "quit":
+                    if command_result == QUIT:
                         print("Goodbye! 👋")
                         break
                     print(command_result)
@@ -148,18 +219,15 @@ Available commands include: cd, ls, cat, echo, pwd, mkdir, touch, cp, mv, rm, gr
                 
                 # Get AI response
                 print("\n🤖 AI Assistant:")
-                response = self.get_ai_response(user_input)
-                print(response)
+                response = self.get_ai_response(user_input, on_token=self._print_token)
+                print()
                 
-                # Check for command execution suggestions
-                if "[EXECUTE:" in response:
-                    # Extract and store commands for approval
-                    execute_commands = self.command_processor._extract_execute_commands(response)
-                    if execute_commands:
-                        self.command_processor.pending_commands = execute_commands
-                        print("\n" + "="*50)
-                        print("The AI suggested executing commands. Type 'yes'/'oui' to approve or use /approve.")
-                        print("="*50)
+                # Extract suggested commands in a single pass and store them for approval; only the
+                # bracketed form counts, as bare "execute:" occurs in ordinary prose
+                execute_commands = self.command_processor._extract_execute_commands(response, brackets_only=True)
+                if execute_commands:
+                    # One write for the whole block rather than a print per line
+                    print(f"\n{_SEPARATOR}\n{self.command_processor._handle_execute_commands(execute_commands)}\n{_SEPARATOR}")
                 
         except KeyboardInterrupt:
             print("\n\nGoodbye! 👋")
@@ -171,12 +239,15 @@ Available commands include: cd, ls, cat, echo, pwd, mkdir, touch, cp, mv, rm, gr
         finally:
             # Stop auto-archiving when exiting
             self.archive_manager.stop_auto_archive()
+            self.command_processor.approval_analyzer.save_cache()
+            self._save_input_history()
             if self.archive_manager.auto_archive and self.archive_manager.current_session_file:
                 print(f"📁 Final conversation saved to: {self.archive_manager.current_session_file.name}")
 
 def check_virtual_environment():
     """Check if running in a virtual environment."""
-    in_venv = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
+    # real_prefix is set by the legacy virtualenv tool, base_prefix differs from prefix in a venv
+    in_venv = sys.prefix != getattr(sys, 'base_prefix', sys.prefix) or hasattr(sys, 'real_prefix')
     
     if not in_venv:
         print("⚠️  WARNING: You are not running in a virtual environment!")
@@ -194,6 +265,8 @@ def main():
     parser = argparse.ArgumentParser(description="Terminal AI Assistant")
     parser.add_argument("--model", "-m", default="llama3.2", help="Ollama model to use")
     parser.add_argument("--archive-dir", "-a", default="./conversations", help="Archive directory")
+    parser.add_argument("--context-window", "-w", type=int, default=20,
+                        help="Number of recent messages sent to the model (0 for the whole conversation)")
     parser.add_argument("--skip-venv-check", action="store_true", help="Skip virtual environment check")
     
     args = parser.parse_args()
@@ -202,7 +275,8 @@ def main():
     if not args.skip_venv_check:
         check_virtual_environment()
     
-    assistant = TerminalAIAssistant(model=args.model, archive_dir=args.archive_dir)
+    assistant = TerminalAIAssistant(model=args.model, archive_dir=args.archive_dir,
+                                    context_window=args.context_window)
     assistant.run()
 
 if __name__ == "__main__":
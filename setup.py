@@ -7,14 +7,15 @@ Creates virtual environment and installs dependencies
 import os
 import sys
 import subprocess
-import platform
 from pathlib import Path
 
+_IS_WINDOWS = os.name == "nt"
+
 def run_command(command, description):
-    """Run a command and handle errors."""
+    """Run a command (an argument list, executed without a shell) and handle errors."""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
         print(f"✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -34,28 +35,28 @@ def create_virtual_environment():
         return True
     
     # Create virtual environment
-    if not run_command(f"{sys.executable} -m venv venv", "Creating virtual environment"):
+    if not run_command([sys.executable, "-m", "venv", "venv"], "Creating virtual environment"):
         return False
     
     return True
 
 def get_activation_command():
     """Get the activation command based on the platform."""
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         return "venv\\Scripts\\activate"
     else:
         return "source venv/bin/activate"
 
 def get_python_command():
     """Get the Python command for the virtual environment."""
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         return "venv\\Scripts\\python"
     else:
         return "venv/bin/python"
 
 def get_pip_command():
     """Get the pip command for the virtual environment."""
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         return "venv\\Scripts\\pip"
     else:
         return "venv/bin/pip"
@@ -66,60 +67,61 @@ def install_dependencies():
     pip_cmd = get_pip_command()
     
     # Upgrade pip first using python -m pip (recommended method)
-    if not run_command(f"{python_cmd} -m pip install --upgrade pip", "Upgrading pip"):
+    if not run_command([python_cmd, "-m", "pip", "install", "--upgrade", "pip"], "Upgrading pip"):
         print("⚠️  Warning: Failed to upgrade pip, continuing with current version")
     
-    # Install requirements
-    if not run_command(f"{pip_cmd} install -r requirements.txt", "Installing requirements"):
-        return False
-    
-    # Install optional script dependencies
+    # Install requirements together with the optional script dependencies, in a single resolver pass
     scripts_req = Path("scripts/requirements.txt")
     if scripts_req.exists():
-        if not run_command(f"{pip_cmd} install -r scripts/requirements.txt", "Installing script requirements"):
-            print("⚠️  Warning: Some script dependencies failed to install")
+        if run_command([pip_cmd, "install", "-r", "requirements.txt", "-r", str(scripts_req)],
+                       "Installing requirements and script requirements"):
+            return True
+        print("⚠️  Warning: Some script dependencies failed to install")
+    
+    # Install requirements
+    if not run_command([pip_cmd, "install", "-r", "requirements.txt"], "Installing requirements"):
+        return False
     
     return True
 
-def create_activation_scripts():
-    """Create platform-specific activation scripts."""
-    
+# Activation scripts written by create_activation_scripts: (file name, content, mode on Unix)
+_ACTIVATION_SCRIPTS = (
     # Windows batch file
-    with open("activate.bat", "w", encoding="utf-8") as f:
-        f.write("""@echo off
+    ("activate.bat", """@echo off
 echo Activating Terminal AI Assistant environment...
 call venv\\Scripts\\activate.bat
 echo Virtual environment activated!
 echo.
 echo To run the assistant: python main.py
 echo To deactivate: deactivate
-""")
-    
-    # Unix shell script
-    with open("activate.sh", "w", encoding="utf-8") as f:
-        f.write("""#!/bin/bash
+""", None),
+    # Unix shell script, made executable
+    ("activate.sh", """#!/bin/bash
 echo "Activating Terminal AI Assistant environment..."
 source venv/bin/activate
 echo "Virtual environment activated!"
 echo ""
 echo "To run the assistant: python main.py"
 echo "To deactivate: deactivate"
-""")
-    
+""", 0o755),
     # PowerShell script
-    with open("activate.ps1", "w", encoding="utf-8") as f:
-        f.write("""# Terminal AI Assistant Environment Activation
+    ("activate.ps1", """# Terminal AI Assistant Environment Activation
 Write-Host "Activating Terminal AI Assistant environment..." -ForegroundColor Green
 & "venv\\Scripts\\Activate.ps1"
 Write-Host "Virtual environment activated!" -ForegroundColor Green
 Write-Host ""
 Write-Host "To run the assistant: python main.py" -ForegroundColor Yellow
 Write-Host "To deactivate: deactivate" -ForegroundColor Yellow
-""")
-    
-    # Make shell script executable on Unix
-    if platform.system() != "Windows":
-        os.chmod("activate.sh", 0o755)
+""", None),
+)
+
+def create_activation_scripts():
+    """Create platform-specific activation scripts."""
+    for filename, content, mode in _ACTIVATION_SCRIPTS:
+        # Text mode keeps the platform's line endings, as cmd.exe expects CRLF in batch files on Windows
+        Path(filename).write_text(content, encoding="utf-8")
+        if mode is not None and not _IS_WINDOWS:
+            os.chmod(filename, mode)
 
 def main():
     """Main setup function."""
@@ -150,7 +152,7 @@ def main():
     print("\n📋 Next steps:")
     print("1. Activate the virtual environment:")
     
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         print("   - Run: activate.bat")
         print("   - Or: activate.ps1 (PowerShell)")
     else: